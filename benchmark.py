@@ -0,0 +1,268 @@
+"""Banc de charge reproductible pour Gallopin.
+
+Démarre `app` en local (base SQLite ou DATABASE_URL, client OpenAI factice à latence réglable), puis joue des
+scénarios réalistes à une concurrence donnée et affiche p50/p95/p99, débit et requêtes SQL par requête HTTP.
+
+Exemples :
+    python benchmark.py --scenario mixed --concurrency 16 --duration 20
+    python benchmark.py --seed-selections 2000000 --seed-reviews 300000 --scenario dashboard
+    python benchmark.py --target-url http://127.0.0.1:8000 --scenario guest   # gunicorn déjà lancé
+"""
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import threading
+import statistics
+import urllib.error
+import urllib.request
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+SCENARIOS = {
+    # nom -> [(poids, action)]
+    "guest": [(80, "public_data"), (20, "generate_review")],
+    "dashboard": [(40, "dashboard_bundle"), (15, "dashboard"), (15, "server_stats"), (15, "menu_performance"), (15, "qualitative_synthesis")],
+    "mixed": [(65, "public_data"), (20, "generate_review"), (10, "dashboard_bundle"), (5, "internal_feedback")],
+}
+
+GUEST_TAGS = {
+    "service_qualities": ["attentionné", "souriant et chaleureux", "professionnel", "efficace et rapide", "de très bon conseil", "discret"],
+    "atmosphere": ["Authentique", "Animée", "Historique", "Chic", "Cosy", "Typiquement Parisienne"],
+    "reason_for_visit": ["un anniversaire", "un dîner romantique", "un dîner entre amis", "une simple visite"],
+}
+ADMIN_ACTIONS = {"dashboard_bundle", "dashboard", "server_stats", "menu_performance", "qualitative_synthesis", "internal_feedback"}
+DEFAULT_DATABASE_URL = "sqlite:///benchmark.db"
+PRIVATE_FEEDBACK = ["Le plat était un peu froid.", "Service très aimable, merci !", "Attente longue avant le dessert.", "Ambiance trop bruyante."]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", choices=[*SCENARIOS, "all"], default="all")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0, help="durée de chaque scénario, en secondes")
+    parser.add_argument("--llm-latency", type=float, default=1.5, help="latence du client OpenAI factice, en secondes")
+    parser.add_argument("--database-url", help=f"prioritaire sur DATABASE_URL ; par défaut DATABASE_URL, sinon {DEFAULT_DATABASE_URL}")
+    parser.add_argument("--target-url", help="serveur déjà démarré (ex. gunicorn) ; sinon l'app est lancée en local")
+    parser.add_argument("--threaded", action="store_true", help="serveur local multi-thread (par défaut : un seul worker synchrone)")
+    parser.add_argument("--seed-selections", type=int, default=0, help="nombre de MenuSelection synthétiques à insérer")
+    parser.add_argument("--seed-reviews", type=int, default=0, help="nombre de GeneratedReview synthétiques à insérer")
+    parser.add_argument("--seed-feedback", type=int, default=0, help="nombre d'InternalFeedback synthétiques à insérer")
+    parser.add_argument("--seed-days", type=int, default=365, help="profondeur d'historique des données synthétiques")
+    parser.add_argument("--random-seed", type=int, default=42)
+    return parser.parse_args()
+
+
+def wants_seed(args):
+    return bool(args.seed_selections or args.seed_reviews or args.seed_feedback)
+
+
+def boot_app(args):
+    database_url = args.database_url or os.getenv("DATABASE_URL") or DEFAULT_DATABASE_URL
+    # Le peuplement insère des millions de lignes et reconstruit les agrégats : jamais sur une base de production
+    # désignée implicitement par DATABASE_URL.
+    if wants_seed(args) and not args.database_url and not database_url.startswith("sqlite"):
+        raise SystemExit(f"Refus de peupler {database_url} (issue de DATABASE_URL) : passer --database-url explicitement.")
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import app as gallopin
+    app = gallopin.create_app({
+        "SQLALCHEMY_DATABASE_URI": database_url,
+        "OPENAI_API_KEY": "benchmark",
+        "LLM_BACKEND": "fake",
+        "FAKE_LLM_LATENCY": args.llm_latency,
+        "SENTIMENT_WORKER": os.getenv("SENTIMENT_WORKER", "0") == "1",
+        "RATELIMIT_ENABLED": False,
+    })
+    with app.app_context():
+        gallopin.init_database()
+    return gallopin, app
+
+
+def seed_history(gallopin, app, args, rng):
+    from sqlalchemy import insert
+    db = gallopin.db
+    now = datetime.now(timezone.utc)
+    chunk = 10000
+
+    def random_moment():
+        return now - timedelta(seconds=rng.randrange(args.seed_days * 86400))
+
+    with app.app_context():
+        dishes = [(f.text, f.category) for f in gallopin.FlavorOption.query.all()]
+        if not gallopin.Server.query.count():
+            db.session.execute(insert(gallopin.Server), [{"name": f"Serveur {i}"} for i in range(1, 13)])
+            db.session.commit()
+            gallopin.invalidate_catalog_caches()
+        servers = [(s.id, s.name) for s in gallopin.Server.query.all()]
+
+        started = time.perf_counter()
+        for model, total, make_row in [
+            (gallopin.MenuSelection, args.seed_selections, lambda: dict(zip(("dish_name", "dish_category"), rng.choice(dishes)), selection_timestamp=random_moment())),
+            (gallopin.GeneratedReview, args.seed_reviews, lambda: dict(zip(("server_id", "server_name"), rng.choice(servers)), created_at=random_moment().replace(tzinfo=None))),
+            (gallopin.InternalFeedback, args.seed_feedback, lambda: {"feedback_text": rng.choice(PRIVATE_FEEDBACK), "created_at": random_moment()}),
+        ]:
+            for offset in range(0, total, chunk):
+                db.session.execute(insert(model), [make_row() for _ in range(min(chunk, total - offset))])
+                db.session.commit()
+            if total: print(f"  {total} lignes {model.__tablename__} insérées")
+        gallopin.rebuild_rollups()
+        print(f"  historique synthétique prêt en {time.perf_counter() - started:.1f} s (agrégats reconstruits)")
+
+
+def start_local_server(app, threaded):
+    from werkzeug.serving import make_server
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server("127.0.0.1", 0, app, threaded=threaded)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+class Client:
+    def __init__(self, base_url, rng, password):
+        self.base_url = base_url
+        self.rng = rng
+        self.password = password
+        self.token = None
+        self.etag = None
+        self.dishes = []
+        self.servers = []
+
+    def request(self, method, path, body=None, headers=None):
+        headers = {"X-Forwarded-Proto": "https", **(headers or {})}
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        req = urllib.request.Request(self.base_url + path, data=data, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(req, timeout=60) as response:
+                return response.status, response.read(), response.headers
+        except urllib.error.HTTPError as e:
+            return e.code, e.read(), e.headers
+
+    def prepare(self, needs_admin):
+        status, body, _ = self.request("POST", "/api/login", {"username": "admin", "password": self.password})
+        if status == 200: self.token = json.loads(body)["access_token"]
+        elif needs_admin:
+            # Sans jeton, chaque requête du dashboard répondrait 401 : les latences mesurées n'auraient aucun sens.
+            raise RuntimeError(f"Connexion admin refusée (HTTP {status}) : vérifier DASHBOARD_PASSWORD.")
+        status, body, headers = self.request("GET", "/api/public/data")
+        data = json.loads(body)
+        self.dishes = [dish["text"] for dishes in data["flavors"].values() for dish in dishes]
+        self.servers = [server["name"] for server in data["servers"]]
+
+    def auth(self):
+        return {"Authorization": f"Bearer {self.token}"} if self.token else {}
+
+    def public_data(self):
+        # La moitié des invités revient avec l'ETag de la visite précédente.
+        headers = {"If-None-Match": self.etag} if self.etag and self.rng.random() < 0.5 else {}
+        status, _, response_headers = self.request("GET", "/api/public/data", headers=headers)
+        self.etag = response_headers.get("ETag") or self.etag
+        return status
+
+    def generate_review(self):
+        tags = [{"category": "dish", "value": dish} for dish in self.rng.sample(self.dishes, k=min(len(self.dishes), self.rng.randint(1, 4)))]
+        for category, values in GUEST_TAGS.items():
+            tags.append({"category": category, "value": self.rng.choice(values)})
+        if self.servers: tags.append({"category": "server_name", "value": self.rng.choice(self.servers)})
+        body = {"lang": self.rng.choice(["fr", "fr", "en", "es"]), "tags": tags}
+        if self.rng.random() < 0.15: body["private_feedback"] = self.rng.choice(PRIVATE_FEEDBACK)
+        return self.request("POST", "/generate-review", body)[0]
+
+    def period(self):
+        return self.rng.choice(["7days", "30days", "all"])
+
+    def dashboard_bundle(self): return self.request("GET", f"/api/dashboard/bundle?period={self.period()}", headers=self.auth())[0]
+    def dashboard(self): return self.request("GET", f"/dashboard?period={self.period()}", headers=self.auth())[0]
+    def server_stats(self): return self.request("GET", f"/api/server-stats?period={self.period()}", headers=self.auth())[0]
+    def menu_performance(self): return self.request("GET", f"/api/menu-performance?period={self.period()}", headers=self.auth())[0]
+    def qualitative_synthesis(self): return self.request("GET", "/api/qualitative-synthesis", headers=self.auth())[0]
+    def internal_feedback(self): return self.request("GET", "/api/internal-feedback?status=all&limit=50", headers=self.auth())[0]
+
+
+def percentile(values, pct):
+    if not values: return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run_scenario(name, base_url, args, gallopin, password):
+    mix = SCENARIOS[name]
+    actions, weights = [action for _, action in mix], [weight for weight, _ in mix]
+    needs_admin = bool(ADMIN_ACTIONS.intersection(actions))
+    samples = []
+    samples_lock = threading.Lock()
+    deadline = time.monotonic() + args.duration
+
+    def worker(index):
+        rng = random.Random(args.random_seed * 1000 + index)
+        client = Client(base_url, rng, password)
+        client.prepare(needs_admin)
+        local = []
+        while time.monotonic() < deadline:
+            action = rng.choices(actions, weights)[0]
+            started = time.perf_counter()
+            status = getattr(client, action)()
+            local.append((action, status, time.perf_counter() - started))
+        with samples_lock: samples.extend(local)
+
+    queries_before = gallopin.metrics.total("db_queries_total") if gallopin else None
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(worker, range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    queries = gallopin.metrics.total("db_queries_total") - queries_before if gallopin else None
+    report(name, samples, elapsed, queries, args)
+
+
+def report(name, samples, elapsed, queries, args):
+    print(f"\n=== Scénario {name} — concurrence {args.concurrency}, {elapsed:.1f} s ===")
+    if not samples:
+        print("  aucune requête terminée")
+        return
+    header = f"  {'action':<24}{'req':>7}{'err':>6}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+    print(header)
+    for action in sorted({sample[0] for sample in samples}) + ["TOTAL"]:
+        rows = samples if action == "TOTAL" else [sample for sample in samples if sample[0] == action]
+        latencies = [latency * 1000 for _, _, latency in rows]
+        errors = sum(1 for _, status, _ in rows if status >= 400)
+        print(f"  {action:<24}{len(rows):>7}{errors:>6}{len(rows) / elapsed:>9.1f}"
+              f"{percentile(latencies, 50):>9.1f}{percentile(latencies, 95):>9.1f}{percentile(latencies, 99):>9.1f}")
+    if queries is not None:
+        print(f"  requêtes SQL : {queries} au total, {queries / len(samples):.2f} par requête HTTP "
+              f"(médiane de latence globale {statistics.median(l for _, _, l in samples) * 1000:.1f} ms)")
+
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.random_seed)
+    gallopin = None
+    server = None
+    if args.target_url:
+        base_url = args.target_url.rstrip("/")
+        password = os.getenv("DASHBOARD_PASSWORD", "GallopinDashboard2025!")
+        if wants_seed(args):
+            print("Le peuplement synthétique n'est disponible qu'avec l'application lancée en local.", file=sys.stderr)
+            return 2
+    else:
+        gallopin, app = boot_app(args)
+        password = app.config["DASHBOARD_PASSWORD"]
+        if wants_seed(args):
+            print("Peuplement de l'historique synthétique...")
+            seed_history(gallopin, app, args, rng)
+        server, base_url = start_local_server(app, args.threaded)
+        print(f"Application locale sur {base_url} ({'multi-thread' if args.threaded else 'un seul worker synchrone'}), "
+              f"base {app.config['SQLALCHEMY_DATABASE_URI']}, latence LLM factice {args.llm_latency} s")
+
+    for name in (SCENARIOS if args.scenario == "all" else [args.scenario]):
+        run_scenario(name, base_url, args, gallopin, password)
+    if server: server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+import pytest
+from flask.testing import FlaskClient
+
+import app as gallopin
+
+
+class HTTPSClient(FlaskClient):
+    # Talisman redirige le HTTP vers HTTPS.
+    def open(self, *args, **kwargs):
+        kwargs.setdefault("base_url", "https://localhost")
+        return super().open(*args, **kwargs)
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    def make(**overrides):
+        application = gallopin.create_app({
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'gallopin.db'}",
+            "OPENAI_API_KEY": "test",
+            "LLM_BACKEND": "fake",
+            "FAKE_LLM_LATENCY": 0.01,
+            "SENTIMENT_WORKER": False,
+            "RATELIMIT_ENABLED": False,
+            **overrides,
+        })
+        with application.app_context():
+            gallopin.init_database()
+        application.test_client_class = HTTPSClient
+        apps.append(application)
+        return application
+
+    apps = []
+    yield make
+    for application in apps:
+        buffer = application.extensions.get("gallopin.feedback_buffer")
+        if buffer is not None: buffer.stop()
+        with application.app_context():
+            gallopin.db.engine.dispose()
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers_for():
+    def login(application):
+        response = application.test_client().post("/api/login", json={"username": "admin", "password": application.config["DASHBOARD_PASSWORD"]})
+        return {"Authorization": f"Bearer {response.get_json()['access_token']}"}
+    return login
+
+
+@pytest.fixture
+def auth_headers(app, auth_headers_for):
+    return auth_headers_for(app)
@@ -0,0 +1,57 @@
+import app as gallopin
+
+
+def feedback_event(text):
+    return {gallopin.InternalFeedback: [{"feedback_text": text}]}
+
+
+def count_feedback(app):
+    with app.app_context():
+        return gallopin.InternalFeedback.query.count()
+
+
+def test_buffer_flushes_in_background(app):
+    buffer = gallopin.FeedbackBuffer(app, flush_interval=0.01, flush_batch=10)
+    buffer.start()
+    try:
+        for i in range(25): assert buffer.put(feedback_event(f"Retour {i}"))
+        for _ in range(200):
+            if buffer.metrics()["flushed_events"] == 25: break
+            gallopin.time.sleep(0.01)
+    finally:
+        buffer.stop()
+    assert count_feedback(app) == 25
+
+
+def test_stop_drains_the_whole_queue(app):
+    # Sans thread démarré, tout ce qui est en file doit être écrit par stop(), pas seulement le premier lot.
+    buffer = gallopin.FeedbackBuffer(app, max_size=500, flush_batch=20)
+    for i in range(150): assert buffer.put(feedback_event(f"Retour {i}"))
+    buffer.stop()
+    assert count_feedback(app) == 150
+    assert buffer.metrics()["queue_depth"] == 0
+
+
+def test_failed_batch_is_retried_per_event(app):
+    buffer = gallopin.FeedbackBuffer(app, flush_batch=10)
+    for i in range(5): buffer.put(feedback_event(f"Retour {i}"))
+    buffer.put({gallopin.InternalFeedback: [{"feedback_text": None}]})
+    buffer.stop()
+    assert count_feedback(app) == 5
+    assert buffer.metrics()["lost_events"] == 1
+
+
+def test_put_is_refused_after_stop(app):
+    buffer = gallopin.FeedbackBuffer(app)
+    buffer.stop()
+    assert not buffer.put(feedback_event("Trop tard"))
+    assert count_feedback(app) == 0
+
+
+def test_route_answers_503_once_the_buffer_is_stopped(make_app):
+    app = make_app(FEEDBACK_WRITE_BEHIND=True)
+    client = app.test_client()
+    assert client.post("/generate-review", json={"private_feedback": "Avant l'arrêt"}).status_code == 200
+    app.extensions["gallopin.feedback_buffer"].stop()
+    assert client.post("/generate-review", json={"private_feedback": "Après l'arrêt"}).status_code == 503
+    assert count_feedback(app) == 1
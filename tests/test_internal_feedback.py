@@ -0,0 +1,61 @@
+import base64
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+import app as gallopin
+
+
+def add_feedback(app, count, created_at):
+    with app.app_context():
+        gallopin.db.session.add_all([gallopin.InternalFeedback(feedback_text=f"Retour {i}", created_at=created_at) for i in range(count)])
+        gallopin.db.session.commit()
+
+
+def encode(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def test_keyset_paging_with_tied_created_at(app, client, auth_headers):
+    add_feedback(app, 7, datetime(2025, 3, 1, 12, 0, tzinfo=timezone.utc))
+    add_feedback(app, 2, datetime(2025, 2, 1, 12, 0, tzinfo=timezone.utc))
+    seen, cursor = [], None
+    while True:
+        url = "/api/internal-feedback?status=all&limit=2" + (f"&cursor={cursor}" if cursor else "")
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 200
+        body = response.get_json()
+        seen.extend(item["id"] for item in body["items"])
+        cursor = body["next_cursor"]
+        if not cursor: break
+    assert len(seen) == len(set(seen)) == 9
+    assert seen[:7] == sorted(seen[:7], reverse=True)
+
+
+@pytest.mark.parametrize("cursor", [
+    encode({"id": 1}),
+    encode([1, 2]),
+    encode("2025-01-01"),
+    encode({"created_at": "hier", "id": 1}),
+    "pas-du-base64!",
+])
+def test_malformed_cursor_is_rejected(client, auth_headers, cursor):
+    response = client.get(f"/api/internal-feedback?status=all&cursor={cursor}", headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_ranked_search_pages_by_relevance(app, client, auth_headers):
+    with app.app_context():
+        gallopin.db.session.add_all([
+            gallopin.InternalFeedback(feedback_text="Service lent mais dessert parfait"),
+            gallopin.InternalFeedback(feedback_text="Service impeccable"),
+            gallopin.InternalFeedback(feedback_text="Dessert trop sucré"),
+            gallopin.InternalFeedback(feedback_text="Rien à signaler"),
+        ])
+        gallopin.db.session.commit()
+    first = client.get("/api/internal-feedback?status=all&search=service dessert&limit=1", headers=auth_headers).get_json()
+    assert [item["feedback_text"] for item in first["items"]] == ["Service lent mais dessert parfait"]
+    rest = client.get(f"/api/internal-feedback?status=all&search=service dessert&cursor={first['next_cursor']}", headers=auth_headers).get_json()
+    assert sorted(item["feedback_text"] for item in rest["items"]) == ["Dessert trop sucré", "Service impeccable"]
+    assert rest["next_cursor"] is None
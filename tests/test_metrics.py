@@ -0,0 +1,49 @@
+import time
+
+import app as gallopin
+
+SUBMISSION = {"tags": [{"category": "dish", "value": "La sole"}, {"category": "atmosphere", "value": "Cosy"}]}
+
+
+def histogram(name, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    with gallopin.metrics._lock:
+        entry = gallopin.metrics._histograms.get(key, {"sum": 0.0, "count": 0})
+        return entry["sum"], entry["count"]
+
+
+def test_sql_time_is_observed_per_endpoint(client):
+    before = histogram("http_request_sql_seconds", endpoint="/api/public/data")
+    assert client.get("/api/public/data").status_code == 200
+    total, count = histogram("http_request_sql_seconds", endpoint="/api/public/data")
+    assert count == before[1] + 1
+    assert total >= before[0]
+
+
+def test_streamed_response_is_timed_until_the_body_ends(client, monkeypatch):
+    def slow_stream(prompt_text, timeout=None):
+        for word in ("Un", " avis", " lent"):
+            time.sleep(0.1)
+            yield word
+
+    monkeypatch.setattr(gallopin, "stream_review", slow_stream)
+    labels = {"endpoint": "/generate-review/stream", "method": "POST"}
+    before = histogram("http_request_duration_seconds", **labels)
+    response = client.post("/generate-review/stream", json=SUBMISSION)
+    assert histogram("http_request_duration_seconds", **labels) == before
+    response.get_data()
+    response.close()
+    total, count = histogram("http_request_duration_seconds", **labels)
+    assert count == before[1] + 1
+    assert total - before[0] >= 0.3
+
+
+def test_export_counts_queries_run_while_streaming(client, auth_headers):
+    before = histogram("http_request_sql_queries", endpoint="/api/export/<dataset>")
+    response = client.get("/api/export/menu-selections", headers=auth_headers)
+    assert response.status_code == 200
+    response.get_data()
+    response.close()
+    total, count = histogram("http_request_sql_queries", endpoint="/api/export/<dataset>")
+    assert count == before[1] + 1
+    assert total - before[0] >= 1
@@ -0,0 +1,63 @@
+import pytest
+
+import app as gallopin
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_cache(request, app, tmp_path):
+    def make(**options):
+        return gallopin.ReviewCache(request.param, str(tmp_path / "review_cache.sqlite3"), **options)
+    with app.app_context():
+        yield make
+
+
+def fill(cache, key, *reviews):
+    for review in reviews: cache.store(key, review)
+
+
+def test_duplicate_reviews_still_fill_the_pool(make_cache):
+    cache = make_cache(pool_size=3)
+    fill(cache, "k", "Même avis", "Même avis")
+    assert cache.lookup("k") is None
+    cache.store("k", "Même avis")
+    assert cache.lookup("k") == "Même avis"
+    assert cache.stats()["hits"] == 1
+
+
+def test_pool_rotates_through_distinct_reviews(make_cache):
+    cache = make_cache(pool_size=2)
+    fill(cache, "k", "A", "B")
+    assert {cache.lookup("k") for _ in range(4)} == {"A", "B"}
+
+
+def test_least_recently_used_entry_is_evicted(make_cache):
+    cache = make_cache(max_entries=2, pool_size=1)
+    fill(cache, "a", "A")
+    fill(cache, "b", "B")
+    assert cache.lookup("a") == "A"
+    fill(cache, "c", "C")
+    assert cache.stats()["entries"] == 2
+    assert cache.lookup("b") is None
+    assert cache.lookup("a") == "A" and cache.lookup("c") == "C"
+
+
+def test_expired_entry_is_a_miss(make_cache, monkeypatch):
+    cache = make_cache(pool_size=1, ttl=60)
+    fill(cache, "k", "A")
+    assert cache.lookup("k") == "A"
+    now = gallopin.time.time()
+    monkeypatch.setattr(gallopin.time, "time", lambda: now + 61)
+    assert cache.lookup("k") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_catalog_edit_clears_the_cache(make_app, auth_headers_for):
+    app = make_app(REVIEW_CACHE_POOL_SIZE=1)
+    client = app.test_client()
+    submission = {"tags": [{"category": "dish", "value": "La sole"}, {"category": "atmosphere", "value": "Cosy"}]}
+    client.post("/generate-review", json=submission)
+    cache = app.extensions["gallopin.review_cache"]
+    assert cache.stats()["entries"] == 1
+    response = client.post("/api/servers", json={"name": "Camille"}, headers=auth_headers_for(app))
+    assert response.status_code == 201
+    assert cache.stats()["entries"] == 0
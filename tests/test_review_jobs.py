@@ -0,0 +1,75 @@
+import time
+
+import app as gallopin
+
+SUBMISSION = {"tags": [{"category": "dish", "value": "La sole"}, {"category": "atmosphere", "value": "Cosy"}]}
+
+
+def test_full_queue_answers_503_with_retry_after(make_app):
+    app = make_app(REVIEW_QUEUE_SIZE=1)
+    client = app.test_client()
+    queue = app.extensions["gallopin.review_queue"]
+    with app.app_context():
+        assert gallopin.reserve_review_slot()
+    for path in ("/generate-review?mode=job", "/generate-review/stream"):
+        response = client.post(path, json=SUBMISSION)
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "5"
+    assert queue.in_flight == 1
+    with app.app_context():
+        gallopin.release_review_slot()
+    assert client.post("/generate-review?mode=job", json=SUBMISSION).status_code == 202
+
+
+def test_failing_submission_releases_its_slot(make_app, monkeypatch):
+    app = make_app(REVIEW_QUEUE_SIZE=1)
+    client = app.test_client()
+    queue = app.extensions["gallopin.review_queue"]
+    bad = {"tags": [{"category": "dish", "value": ["pas une chaîne"]}]}
+    assert client.post("/generate-review/stream", json=bad).status_code == 400
+
+    def broken_prompt(*args):
+        raise RuntimeError("prompt")
+
+    monkeypatch.setattr(gallopin, "build_review_prompt", broken_prompt)
+    for path in ("/generate-review?mode=job", "/generate-review/stream"):
+        assert client.post(path, json=SUBMISSION).status_code == 500
+        assert queue.in_flight == 0
+
+
+def test_job_past_its_timeout_is_reported_as_timeout(make_app):
+    app = make_app(REVIEW_JOB_TIMEOUT=5)
+    with app.app_context():
+        gallopin._save_review_job("ancien", {"status": "pending", "review": None, "created_at": time.time() - 10})
+        assert gallopin.get_review_job("ancien")["status"] == "timeout"
+        assert gallopin.shared_state.get("review-job:ancien")["status"] == "timeout"
+        gallopin._save_review_job("recent", {"status": "pending", "review": None, "created_at": time.time()})
+        assert gallopin.get_review_job("recent")["status"] == "pending"
+
+
+def test_timed_out_job_is_skipped_but_releases_its_slot(make_app, monkeypatch):
+    app = make_app(REVIEW_JOB_TIMEOUT=5)
+    calls = []
+    monkeypatch.setattr(gallopin, "complete_review", lambda *args, **kwargs: calls.append(args) or "Avis")
+    queue = app.extensions["gallopin.review_queue"]
+    with app.app_context():
+        assert gallopin.reserve_review_slot()
+        gallopin._save_review_job("expire", {"status": "pending", "review": None, "created_at": time.time() - 10})
+        gallopin.get_review_job("expire")
+    gallopin._run_review_job(app, "expire", "prompt")
+    assert calls == []
+    assert queue.in_flight == 0
+    with app.app_context():
+        assert gallopin.shared_state.get("review-job:expire")["status"] == "timeout"
+
+
+def test_job_runs_to_completion(app, client):
+    response = client.post("/generate-review?mode=job", json=SUBMISSION)
+    assert response.status_code == 202
+    status_url = response.get_json()["status_url"]
+    for _ in range(100):
+        job = client.get(status_url).get_json()
+        if job["status"] == "done": break
+        time.sleep(0.02)
+    assert job["status"] == "done" and "Gallopin" in job["review"]
+    assert app.extensions["gallopin.review_queue"].in_flight == 0
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import inspect, text
+
+import app as gallopin
+
+
+def rollup_counts():
+    return {
+        (row.day, row.server_id): row.review_count
+        for row in gallopin.DailyServerReviews.query.all()
+    }
+
+
+def test_backfill_links_known_servers(app):
+    with app.app_context():
+        server = gallopin.Server(name="Camille")
+        gallopin.db.session.add(server)
+        gallopin.db.session.commit()
+        base = datetime(2025, 1, 1, 23, 30)
+        gallopin.db.session.add_all([
+            gallopin.GeneratedReview(server_name="Camille", created_at=base),
+            gallopin.GeneratedReview(server_name="Camille", created_at=base + timedelta(days=10)),
+            gallopin.GeneratedReview(server_name="Ancien serveur", created_at=base),
+        ])
+        gallopin.db.session.commit()
+
+        # Avant le backfill, les agrégats comptent tous les avis sous NO_SERVER_ID.
+        gallopin.rebuild_rollups()
+        assert gallopin.backfill_review_server_ids(batch_size=2) == 2
+        gallopin.rebuild_rollup_by_day(gallopin.DailyServerReviews, days_per_batch=3)
+
+        linked = {review.server_name: review.server_id for review in gallopin.GeneratedReview.query.all()}
+        assert linked == {"Camille": server.id, "Ancien serveur": None}
+        expected = {
+            (base.date(), server.id): 1,
+            (base.date() + timedelta(days=10), server.id): 1,
+            (base.date(), gallopin.NO_SERVER_ID): 1,
+        }
+        assert rollup_counts() == expected
+        gallopin.rebuild_rollups()
+        assert rollup_counts() == expected
+
+def test_upgrade_drops_the_server_name_index(app):
+    with app.app_context():
+        gallopin.db.session.execute(text("CREATE INDEX ix_generated_review_server_name ON generated_review (server_name)"))
+        gallopin.db.session.commit()
+        gallopin.upgrade_schema()
+        indexes = {index["name"] for index in inspect(gallopin.db.engine).get_indexes("generated_review")}
+    assert "ix_generated_review_server_name" not in indexes
+    assert "ix_generated_review_server_id_created_at" in indexes
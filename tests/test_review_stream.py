@@ -0,0 +1,50 @@
+import json
+
+import app as gallopin
+
+SUBMISSION = {"lang": "fr", "tags": [{"category": "dish", "value": "Sole meunière"}, {"category": "ambiance", "value": "Chaleureuse"}]}
+
+
+def parse_sse(body):
+    events = []
+    for frame in body.split("\n\n"):
+        if not frame: continue
+        lines = frame.split("\n")
+        assert lines[0].startswith("event: ") and lines[1].startswith("data: ") and len(lines) == 2
+        events.append((lines[0][len("event: "):], json.loads(lines[1][len("data: "):])))
+    return events
+
+
+def test_sse_event_framing():
+    frame = gallopin.sse_event("token", {"text": "ligne 1\nligne 2 é"})
+    assert frame.endswith("\n\n")
+    assert parse_sse(frame) == [("token", {"text": "ligne 1\nligne 2 é"})]
+
+
+def test_stream_sends_tokens_then_done(app, client):
+    response = client.post("/generate-review/stream", json=SUBMISSION)
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    events = parse_sse(response.get_data(as_text=True))
+    response.close()
+    assert [name for name, _ in events[:-1]] == ["token"] * (len(events) - 1)
+    assert events[-1] == ("done", {})
+    assert "Gallopin" in "".join(payload["text"] for _, payload in events[:-1])
+    # La place de la file est rendue à la fermeture de la réponse.
+    assert app.extensions["gallopin.review_queue"].in_flight == 0
+
+
+def test_stream_reports_mid_stream_error(app, client, monkeypatch):
+    def failing_stream(prompt_text, timeout=None):
+        yield "Un début"
+        raise RuntimeError("connexion perdue")
+
+    monkeypatch.setattr(gallopin, "stream_review", failing_stream)
+    response = client.post("/generate-review/stream", json=SUBMISSION)
+    events = parse_sse(response.get_data(as_text=True))
+    response.close()
+    assert events[0] == ("token", {"text": "Un début"})
+    assert events[-1][0] == "error"
+    assert "done" not in [name for name, _ in events]
+    # La place de la file est rendue à la fermeture de la réponse.
+    assert app.extensions["gallopin.review_queue"].in_flight == 0
@@ -0,0 +1,79 @@
+from datetime import datetime, timezone
+
+import app as gallopin
+
+SUBMISSIONS = [
+    {"tags": [{"category": "server_name", "value": "Camille"}, {"category": "dish", "value": "La sole"}, {"category": "atmosphere", "value": "Cosy"}]},
+    {"tags": [{"category": "server_name", "value": "Inconnu"}, {"category": "dish", "value": "La sole"}, {"category": "dish", "value": "Profiteroles"}]},
+    {"tags": [{"category": "dish", "value": "Plat hors carte"}, {"category": "service_qualities", "value": "efficace et rapide"}], "private_feedback": "Merci"},
+    {"tags": [{"category": "server_name", "value": "Camille"}, {"category": "atmosphere", "value": "Cosy"}]},
+]
+
+
+def rollup_snapshot():
+    snapshot = {}
+    for rollup_model, _, _, key_columns, count_column in gallopin.ROLLUPS:
+        snapshot[rollup_model.__tablename__] = {
+            (row.day, *(getattr(row, column) for column in key_columns)): getattr(row, count_column)
+            for row in rollup_model.query.all()
+        }
+    return snapshot
+
+
+def add_server(app, name):
+    with app.app_context():
+        gallopin.db.session.add(gallopin.Server(name=name))
+        gallopin.db.session.commit()
+        gallopin.invalidate_catalog_caches()
+
+
+def assert_matches_rebuild(app):
+    with app.app_context():
+        incremental = rollup_snapshot()
+        gallopin.rebuild_rollups()
+        assert incremental == rollup_snapshot()
+    return incremental
+
+
+def test_incremental_rollups_match_rebuild(app, client):
+    add_server(app, "Camille")
+    for submission in SUBMISSIONS:
+        assert client.post("/generate-review", json=submission).status_code == 200
+    incremental = assert_matches_rebuild(app)
+    today = datetime.now(timezone.utc).date()
+    assert incremental["daily_dish_selections"][(today, "La sole", "Plats")] == 2
+    with app.app_context():
+        camille = gallopin.Server.query.filter_by(name="Camille").one().id
+    assert incremental["daily_server_reviews"] == {(today, camille): 2, (today, gallopin.NO_SERVER_ID): 1}
+
+
+def test_write_behind_rollups_match_rebuild(make_app):
+    app = make_app(FEEDBACK_WRITE_BEHIND=True)
+    add_server(app, "Camille")
+    client = app.test_client()
+    for submission in SUBMISSIONS:
+        assert client.post("/generate-review", json=submission).status_code == 200
+    app.extensions["gallopin.feedback_buffer"].stop()
+    incremental = assert_matches_rebuild(app)
+    assert sum(incremental["daily_server_reviews"].values()) == 3
+
+
+def test_init_database_fills_empty_rollups(app, client):
+    for submission in SUBMISSIONS:
+        client.post("/generate-review", json=submission)
+    with app.app_context():
+        expected = rollup_snapshot()
+        gallopin.db.session.execute(gallopin.delete(gallopin.DailyDishSelections))
+        gallopin.db.session.commit()
+        gallopin.init_database()
+        assert rollup_snapshot() == expected
+
+
+def test_rollup_day_is_the_utc_day(app):
+    # 23h30 à Montréal le 1er janvier = 2 janvier en UTC, côté agrégat incrémental comme côté reconstruction.
+    evening = datetime(2025, 1, 1, 23, 30, tzinfo=timezone(-gallopin.timedelta(hours=5)))
+    buffer = gallopin.FeedbackBuffer(app)
+    buffer.put({gallopin.MenuSelection: [{"dish_name": "La sole", "dish_category": "Plats", "selection_timestamp": evening}]})
+    buffer.stop()
+    incremental = assert_matches_rebuild(app)
+    assert incremental["daily_dish_selections"] == {(datetime(2025, 1, 2).date(), "La sole", "Plats"): 1}
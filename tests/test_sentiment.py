@@ -0,0 +1,78 @@
+from datetime import datetime, timezone
+
+import pytest
+
+import app as gallopin
+
+
+@pytest.mark.parametrize("text, sign", [
+    ("Le plat était bon", 1),
+    ("Le plat n'était pas bon", -1),
+    ("The food wasn't good", -1),
+    ("The food wasn’t cold", 1),
+    ("Service plus rapide que prévu", 1),
+    ("Jamais froid, toujours parfait", 1),
+])
+def test_lexicon_polarity(text, sign):
+    score, _ = gallopin.LexiconSentimentScorer().score(text)
+    assert score * sign > 0
+
+
+def test_lexicon_topic_and_bounds():
+    scorer = gallopin.LexiconSentimentScorer()
+    assert scorer.score("Le serveur était lent, longue attente") == (-1.0, "Service")
+    assert scorer.score("Dessert excellent")[1] == "Cuisine"
+    assert scorer.score("Excellent") == (pytest.approx(1 / 3), None)
+
+
+def add_feedback(texts):
+    gallopin.db.session.add_all([gallopin.InternalFeedback(feedback_text=text) for text in texts])
+    gallopin.db.session.commit()
+
+
+def test_claims_never_overlap(app):
+    with app.app_context():
+        add_feedback(["Un", "Deux", "Trois"])
+        first = gallopin.claim_pending_feedback(2)
+        second = gallopin.claim_pending_feedback(2)
+        assert [text for _, text in first] == ["Un", "Deux"]
+        assert [text for _, text in second] == ["Trois"]
+        assert gallopin.claim_pending_feedback(2) == []
+
+
+def test_expired_claim_is_taken_again(make_app):
+    app = make_app(SENTIMENT_CLAIM_TTL=-1)
+    with app.app_context():
+        add_feedback(["Un"])
+        assert len(gallopin.claim_pending_feedback(5)) == 1
+        assert len(gallopin.claim_pending_feedback(5)) == 1
+
+
+def test_each_row_is_scored_once(app, monkeypatch):
+    scored = []
+    scorer = gallopin.LexiconSentimentScorer()
+    monkeypatch.setattr(gallopin.lexicon_sentiment_scorer, "score_batch", lambda texts: scored.extend(texts) or scorer.score_batch(texts))
+    with app.app_context():
+        add_feedback([f"Service lent {i}" for i in range(5)])
+        while gallopin.score_pending_feedback(batch_size=2): pass
+        assert sorted(scored) == sorted(f"Service lent {i}" for i in range(5))
+        assert gallopin.InternalFeedback.query.filter(gallopin.InternalFeedback.sentiment_score.is_(None)).count() == 0
+
+
+def test_sif_synthesis_from_scored_feedback(app):
+    now = datetime.now(timezone.utc)
+    with app.app_context():
+        gallopin.db.session.add_all([
+            gallopin.InternalFeedback(feedback_text="a", sentiment_score=-0.6, sentiment_topic="Service", created_at=now),
+            gallopin.InternalFeedback(feedback_text="b", sentiment_score=-0.4, sentiment_topic="Service", created_at=now),
+            gallopin.InternalFeedback(feedback_text="c", sentiment_score=0.8, sentiment_topic="Cuisine", created_at=now),
+            gallopin.InternalFeedback(feedback_text="d", sentiment_score=None, created_at=now),
+        ])
+        gallopin.db.session.commit()
+        synthesis = gallopin.compute_sif_synthesis("7days")
+    assert "Cuisine : retours majoritairement positifs" in synthesis["strengths"]
+    assert synthesis["weaknesses"] == ["Service : 2 retour(s) négatif(s) sur 2"]
+    assert synthesis["suggestions"] == [{"category": "Service", "suggestion": gallopin.SIF_SUGGESTIONS["Service"]}]
+    assert {category["name"] for category in synthesis["categories"]} == {"Service", "Cuisine"}
+    assert len(synthesis["sentiment_trend"]) == 14
+    assert synthesis["sentiment_trend"][-1]["score"] is not None
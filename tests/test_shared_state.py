@@ -0,0 +1,42 @@
+import time
+
+from limits import RateLimitItemPerMinute
+from limits.strategies import FixedWindowRateLimiter
+
+import app as gallopin
+
+
+def test_sqlite_incr_resets_after_expiry(tmp_path):
+    state = gallopin.SQLiteSharedState(str(tmp_path / "shared.sqlite3"))
+    assert state.incr("compteur", ttl=0.2) == 1
+    assert state.incr("compteur", ttl=0.2) == 2
+    expires_at = state.expiry("compteur")
+    time.sleep(0.3)
+    assert state.expiry("compteur") is None
+    assert state.incr("compteur", ttl=0.2) == 1
+    # La fenêtre repart : nouvelle échéance, le TTL n'est pas prolongé par les incréments suivants.
+    assert state.expiry("compteur") > expires_at
+    renewed = state.expiry("compteur")
+    state.incr("compteur", ttl=10)
+    assert state.expiry("compteur") == renewed
+
+
+def test_limiter_counts_are_shared_between_workers(make_app, tmp_path):
+    # Deux applications (comme deux workers gunicorn) avec chacune sa connexion au même fichier.
+    workers = [make_app(SHARED_STATE_URL=f"sqlite:///{tmp_path / 'shared.sqlite3'}") for _ in range(2)]
+    limiter = FixedWindowRateLimiter(gallopin.SharedStateLimiterStorage("shared://"))
+    limit = RateLimitItemPerMinute(3)
+    allowed = []
+    for i in range(4):
+        with workers[i % 2].app_context():
+            allowed.append(limiter.hit(limit, "127.0.0.1"))
+    assert allowed == [True, True, True, False]
+    backends = [worker.extensions["gallopin.shared_state"].backend for worker in workers]
+    assert backends[0] is not backends[1]
+
+
+def test_shared_state_connection_is_opened_lazily(make_app, tmp_path):
+    app = make_app(SHARED_STATE_URL=f"sqlite:///{tmp_path / 'lazy.sqlite3'}")
+    state = app.extensions["gallopin.shared_state"]
+    assert state._backend is None
+    assert isinstance(state.backend, gallopin.SQLiteSharedState)